@@ -1,16 +1,48 @@
 """The Energy Consumption Forecast integration."""
 import logging
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    DATA_FORECASTER,
+    CONF_FORECAST_EXPORT,
+    SERVICE_EXPORT_HISTORY,
+    ATTR_FORMAT,
+)
+from .forecast_export import HISTORY_FORMATS, ForecastExporter
 
 _LOGGER = logging.getLogger(__name__)
 PLATFORMS = ["sensor"]
 
+EXPORT_HISTORY_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_FORMAT, default="csv"): vol.In(HISTORY_FORMATS),
+})
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Energy Consumption Forecast component."""
     hass.data.setdefault(DOMAIN, {})
+
+    async def async_export_history(call: ServiceCall) -> None:
+        """Export the history behind the latest forecast of every entry."""
+        for entry in hass.config_entries.async_entries(DOMAIN):
+            forecaster = hass.data[DOMAIN].get(entry.entry_id, {}).get(DATA_FORECASTER)
+            if forecaster is None or forecaster.history is None:
+                _LOGGER.warning("No forecast history available for %s", entry.title)
+                continue
+
+            path = await forecaster.exporter.async_export_history(
+                call.data[ATTR_FORMAT], forecaster.iter_history()
+            )
+            if path:
+                _LOGGER.info("Exported forecast history of %s to %s", entry.title, path)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXPORT_HISTORY, async_export_history, schema=EXPORT_HISTORY_SCHEMA
+    )
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -21,15 +53,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data[DOMAIN][entry.entry_id] = {}
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
     _LOGGER.debug("Energy Forecast integration setup completed")
     return True
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Energy Forecast integration")
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
+        # Options are already saved when a reload unloads the entry
+        if not {**entry.data, **entry.options}.get(CONF_FORECAST_EXPORT, False):
+            await ForecastExporter(hass, entry.entry_id, False).async_remove_forecast()
         _LOGGER.debug("Energy Forecast integration unloaded successfully")
 
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the forecast export of a removed config entry."""
+    await ForecastExporter(hass, entry.entry_id, False).async_remove_forecast()
\ No newline at end of file
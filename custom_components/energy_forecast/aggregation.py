@@ -0,0 +1,65 @@
+"""Outlier-resistant aggregation of hourly history buckets."""
+import numpy as np
+
+from .const import (
+    AGGREGATION_MEAN,
+    AGGREGATION_MEDIAN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_WINSORIZED_MEAN,
+    TRIM_FRACTION,
+)
+
+
+def aggregate_buckets(
+    values: np.ndarray,
+    aggregation: str = AGGREGATION_MEAN,
+    trim: float = TRIM_FRACTION,
+) -> np.ndarray:
+    """Aggregate a (series x days x 24) array over its days axis.
+
+    Every (series, hour) bucket is sorted once, with missing hours as NaN at
+    the end, so each mode only needs index arithmetic on the sorted buffer.
+    The buffers are as large as the history window. Trimmed and winsorized
+    means cut ``trim`` of the values at each end. Buckets without data, and
+    all buckets when no day is selected, give 0.
+    """
+    if values.shape[1] == 0:
+        return np.zeros((values.shape[0], values.shape[2]))
+
+    ordered = np.sort(values, axis=1)
+    counts = np.count_nonzero(~np.isnan(ordered), axis=1)
+    empty = counts == 0
+    position = np.arange(ordered.shape[1])[np.newaxis, :, np.newaxis]
+    present = position < counts[:, np.newaxis, :]
+
+    if aggregation == AGGREGATION_MEDIAN:
+        lower = _take(ordered, np.maximum(counts - 1, 0) // 2)
+        upper = _take(ordered, counts // 2)
+        result = (lower + upper) / 2
+    elif aggregation == AGGREGATION_TRIMMED_MEAN:
+        cut = np.floor(counts * trim).astype(np.intp)
+        kept = present & (position >= cut[:, np.newaxis, :]) & (
+            position < (counts - cut)[:, np.newaxis, :]
+        )
+        result = _masked_mean(ordered, kept)
+    elif aggregation == AGGREGATION_WINSORIZED_MEAN:
+        cut = np.floor(counts * trim).astype(np.intp)
+        low = _take(ordered, cut)[:, np.newaxis, :]
+        high = _take(ordered, np.maximum(counts - cut - 1, 0))[:, np.newaxis, :]
+        result = _masked_mean(np.clip(ordered, low, high), present)
+    else:
+        result = _masked_mean(ordered, present)
+
+    return np.where(empty, 0.0, np.nan_to_num(result))
+
+
+def _take(ordered: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Return the value at a per-bucket position of the sorted buffers."""
+    return np.take_along_axis(ordered, index[:, np.newaxis, :], axis=1)[:, 0, :]
+
+
+def _masked_mean(ordered: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Average the masked values of every bucket."""
+    counts = np.count_nonzero(mask, axis=1)
+    sums = np.where(mask, ordered, 0.0).sum(axis=1)
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
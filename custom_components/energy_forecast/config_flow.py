@@ -1,26 +1,39 @@
 """Config flow for Energy Consumption Forecast integration."""
 from __future__ import annotations
 
+from functools import partial
 import logging
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import get_metadata
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import selector
 from homeassistant.helpers.entity_registry import async_get
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
+    AGGREGATION_MEAN,
+    AGGREGATIONS,
+    CONF_AGGREGATION,
     CONF_ENERGY_METERS,
     CONF_EXCLUDED_ENTITIES,
+    CONF_FORECAST_EXPORT,
+    CONF_HOLIDAYS,
+    CONF_METER_FORECASTS,
     CONF_VACATION_CALENDAR,
     DEFAULT_NAME,
     ENERGY_UNITS,
+    PREVIEW_HISTORY_DAYS,
 )
+from .forecaster import EnergyForecaster
+from .horizon_calendar import get_horizon_calendar, normalize_holiday
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -59,6 +72,73 @@ async def _validate_calendar(hass: HomeAssistant, entity_id: str | None) -> bool
     domain = entity_id.split('.')[0]
     return domain == "calendar"
 
+def _validate_holidays(holidays: list[str]) -> bool:
+    """Validate holiday dates."""
+    return all(normalize_holiday(holiday) for holiday in holidays)
+
+async def _validate_statistics(hass: HomeAssistant, entity_ids: list[str]) -> list[str]:
+    """Return the entities without long-term sum statistics.
+
+    All entities are checked with a single statistics metadata lookup.
+    """
+    metadata = await get_instance(hass).async_add_executor_job(
+        partial(get_metadata, hass, statistic_ids=set(entity_ids))
+    )
+    return [
+        entity_id
+        for entity_id in entity_ids
+        if entity_id not in metadata or not metadata[entity_id][1].get("has_sum")
+    ]
+
+async def _statistics_errors(
+    hass: HomeAssistant, user_input: dict[str, Any]
+) -> tuple[dict[str, str], dict[str, str]]:
+    """Return form errors and placeholders for entities without statistics.
+
+    The error is shown on the field that holds an entity without statistics.
+    """
+    meters = user_input[CONF_ENERGY_METERS]
+    excluded_entities = user_input.get(CONF_EXCLUDED_ENTITIES, [])
+    try:
+        missing = await _validate_statistics(hass, meters + excluded_entities)
+    except Exception as err:
+        _LOGGER.error("Error reading statistics metadata: %s", err)
+        return {"base": "statistics_unavailable"}, {}
+
+    errors = {}
+    if any(entity_id in meters for entity_id in missing):
+        errors[CONF_ENERGY_METERS] = "missing_statistics"
+    if any(entity_id in excluded_entities for entity_id in missing):
+        errors[CONF_EXCLUDED_ENTITIES] = "missing_statistics"
+    return errors, {"entities": ", ".join(missing)} if missing else {}
+
+async def _async_preview(hass: HomeAssistant, user_input: dict[str, Any]) -> dict[str, str]:
+    """Return description placeholders with a forecast preview.
+
+    The preview only queries the last few days of statistics to stay fast.
+    """
+    now = dt_util.now()
+    forecaster = EnergyForecaster(
+        hass, aggregation=user_input.get(CONF_AGGREGATION, AGGREGATION_MEAN)
+    )
+    forecast = await forecaster.generate_forecast(
+        now,
+        user_input[CONF_ENERGY_METERS],
+        user_input.get(CONF_EXCLUDED_ENTITIES, []),
+        user_input.get(CONF_VACATION_CALENDAR),
+        get_horizon_calendar(hass, now, user_input.get(CONF_HOLIDAYS, [])),
+        history_days=PREVIEW_HISTORY_DAYS,
+    )
+    if not forecast:
+        return {"total": "0.00", "peak_time": "-", "peak": "0.00"}
+
+    peak_time = max(forecast, key=forecast.get)
+    return {
+        "total": f"{sum(forecast.values()):.2f}",
+        "peak_time": peak_time[11:16],
+        "peak": f"{forecast[peak_time]:.2f}",
+    }
+
 class EnergyForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Energy Consumption Forecast."""
 
@@ -77,6 +157,7 @@ class EnergyForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     ) -> FlowResult:
         """Handle the initial step."""
         errors = {}
+        placeholders = {}
 
         if user_input is not None:
             # Validate inputs
@@ -94,17 +175,20 @@ class EnergyForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 and not await _validate_calendar(self.hass, user_input[CONF_VACATION_CALENDAR])
             ):
                 errors[CONF_VACATION_CALENDAR] = "invalid_calendar"
+            elif not _validate_holidays(user_input.get(CONF_HOLIDAYS, [])):
+                errors[CONF_HOLIDAYS] = "invalid_holidays"
             else:
+                errors, placeholders = await _statistics_errors(self.hass, user_input)
+
+            if not errors:
                 # Check if already configured
                 await self.async_set_unique_id(
                     f"energy_forecast_{'_'.join(sorted(user_input[CONF_ENERGY_METERS]))}"
                 )
                 self._abort_if_unique_id_configured()
 
-                return self.async_create_entry(
-                    title=DEFAULT_NAME,
-                    data=user_input,
-                )
+                self._user_input = user_input
+                return await self.async_step_preview()
 
         return self.async_show_form(
             step_id="user",
@@ -128,8 +212,41 @@ class EnergyForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         domain="calendar",
                     ),
                 ),
+                vol.Optional(
+                    CONF_METER_FORECASTS, default=False
+                ): selector.BooleanSelector(),
+                vol.Optional(CONF_HOLIDAYS, default=[]): selector.TextSelector(
+                    selector.TextSelectorConfig(multiple=True),
+                ),
+                vol.Optional(
+                    CONF_AGGREGATION, default=AGGREGATION_MEAN
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=AGGREGATIONS,
+                        translation_key=CONF_AGGREGATION,
+                    ),
+                ),
+                vol.Optional(
+                    CONF_FORECAST_EXPORT, default=False
+                ): selector.BooleanSelector(),
             }),
             errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_preview(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show a forecast preview before creating the entry."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title=DEFAULT_NAME,
+                data=self._user_input,
+            )
+
+        return self.async_show_form(
+            step_id="preview",
+            description_placeholders=await _async_preview(self.hass, self._user_input),
         )
 
 class EnergyForecastOptionsFlow(config_entries.OptionsFlow):
@@ -144,6 +261,7 @@ class EnergyForecastOptionsFlow(config_entries.OptionsFlow):
     ) -> FlowResult:
         """Manage the options."""
         errors = {}
+        placeholders = {}
 
         if user_input is not None:
             # Validate inputs
@@ -161,15 +279,23 @@ class EnergyForecastOptionsFlow(config_entries.OptionsFlow):
                 and not await _validate_calendar(self.hass, user_input[CONF_VACATION_CALENDAR])
             ):
                 errors[CONF_VACATION_CALENDAR] = "invalid_calendar"
+            elif not _validate_holidays(user_input.get(CONF_HOLIDAYS, [])):
+                errors[CONF_HOLIDAYS] = "invalid_holidays"
             else:
-                return self.async_create_entry(title="", data=user_input)
+                errors, placeholders = await _statistics_errors(self.hass, user_input)
+
+            if not errors:
+                self._user_input = user_input
+                return await self.async_step_preview()
 
+        # Options saved by an earlier run of this flow override the entry data
+        config = {**self.config_entry.data, **self.config_entry.options}
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema({
                 vol.Required(
                     CONF_ENERGY_METERS,
-                    default=self.config_entry.data.get(CONF_ENERGY_METERS, []),
+                    default=config.get(CONF_ENERGY_METERS, []),
                 ): selector.EntitySelector(
                     selector.EntitySelectorConfig(
                         domain="sensor",
@@ -179,7 +305,7 @@ class EnergyForecastOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Optional(
                     CONF_EXCLUDED_ENTITIES,
-                    default=self.config_entry.data.get(CONF_EXCLUDED_ENTITIES, []),
+                    default=config.get(CONF_EXCLUDED_ENTITIES, []),
                 ): selector.EntitySelector(
                     selector.EntitySelectorConfig(
                         domain="sensor",
@@ -189,12 +315,48 @@ class EnergyForecastOptionsFlow(config_entries.OptionsFlow):
                 ),
                 vol.Optional(
                     CONF_VACATION_CALENDAR,
-                    default=self.config_entry.data.get(CONF_VACATION_CALENDAR),
+                    default=config.get(CONF_VACATION_CALENDAR),
                 ): selector.EntitySelector(
                     selector.EntitySelectorConfig(
                         domain="calendar",
                     ),
                 ),
+                vol.Optional(
+                    CONF_METER_FORECASTS,
+                    default=config.get(CONF_METER_FORECASTS, False),
+                ): selector.BooleanSelector(),
+                vol.Optional(
+                    CONF_HOLIDAYS,
+                    default=config.get(CONF_HOLIDAYS, []),
+                ): selector.TextSelector(
+                    selector.TextSelectorConfig(multiple=True),
+                ),
+                vol.Optional(
+                    CONF_AGGREGATION,
+                    default=config.get(CONF_AGGREGATION, AGGREGATION_MEAN),
+                ): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=AGGREGATIONS,
+                        translation_key=CONF_AGGREGATION,
+                    ),
+                ),
+                vol.Optional(
+                    CONF_FORECAST_EXPORT,
+                    default=config.get(CONF_FORECAST_EXPORT, False),
+                ): selector.BooleanSelector(),
             }),
             errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_preview(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show a forecast preview before saving the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=self._user_input)
+
+        return self.async_show_form(
+            step_id="preview",
+            description_placeholders=await _async_preview(self.hass, self._user_input),
         )
\ No newline at end of file
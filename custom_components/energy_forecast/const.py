@@ -14,10 +14,55 @@ DOMAIN: Final = "energy_forecast"
 CONF_ENERGY_METERS = "energy_meters"
 CONF_EXCLUDED_ENTITIES = "excluded_entities"
 CONF_VACATION_CALENDAR = "vacation_calendar"
+CONF_METER_FORECASTS = "meter_forecasts"
+CONF_HOLIDAYS = "holidays"
+CONF_FORECAST_EXPORT = "forecast_export"
+CONF_AGGREGATION = "aggregation"
 
 DEFAULT_NAME = "Energy Consumption Forecast"
 ENERGY_UNITS = ["kWh", "Wh"]
 
+# Days of history used to build the hourly profiles
+HISTORY_DAYS = 30
+
+HOURS_PER_DAY = 24
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# Days of history queried for the forecast preview in the config flow
+PREVIEW_HISTORY_DAYS = 7
+
+# Aggregation of the history in each hourly bucket
+AGGREGATION_MEAN = "mean"
+AGGREGATION_MEDIAN = "median"
+AGGREGATION_TRIMMED_MEAN = "trimmed_mean"
+AGGREGATION_WINSORIZED_MEAN = "winsorized_mean"
+AGGREGATIONS = [
+    AGGREGATION_MEAN,
+    AGGREGATION_MEDIAN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_WINSORIZED_MEAN,
+]
+
+# Share of values cut at each end by the trimmed and winsorized means
+TRIM_FRACTION = 0.1
+
+# Day types of the hourly profiles
+DAY_TYPE_WEEKDAY = 0
+DAY_TYPE_WEEKEND = 1
+DAY_TYPE_HOLIDAY = 2
+DAY_TYPES = 3
+
+# Quantile levels written to the forecast export
+EXPORT_QUANTILES = [0.1, 0.5, 0.9]
+
+DATA_HORIZON_CALENDARS = "horizon_calendars"
+DATA_FORECASTER = "forecaster"
+DATA_COORDINATOR = "coordinator"
+
+SERVICE_EXPORT_HISTORY = "export_history"
+ATTR_FORMAT = "format"
+
 # Sensor types
 SENSOR_NEXT_HOUR = "next_hour"
 SENSOR_TODAY = "today"
@@ -35,4 +80,5 @@ SENSOR_TYPES = [
     SENSOR_TOMORROW_TO_SUNRISE,
 ]
 
-ATTR_FORECAST_TIME = "forecast_time"
\ No newline at end of file
+ATTR_FORECAST_TIME = "forecast_time"
+ATTR_METER_FORECASTS = "meter_forecasts"
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""Coordinator that refreshes the forecast of a config entry."""
+from datetime import datetime, timedelta
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .forecaster import EnergyForecaster
+from .horizon_calendar import HorizonCalendar, get_horizon_calendar
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ForecastData(NamedTuple):
+    """Forecast of a config entry and the calendar it was made on."""
+
+    now: datetime
+    calendar: HorizonCalendar
+    forecast: Dict[str, float]
+    meter_forecasts: Dict[str, Dict[str, float]]
+
+
+class EnergyForecastCoordinator(DataUpdateCoordinator[ForecastData]):
+    """Generate the forecast of a config entry once per refresh for all its sensors."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        forecaster: EnergyForecaster,
+        energy_meters: List[str],
+        excluded_entities: List[str],
+        vacation_calendar: Optional[str],
+        holidays: Optional[List[str]] = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=timedelta(hours=1))
+        self.forecaster = forecaster
+        self.energy_meters = energy_meters
+        self.excluded_entities = excluded_entities
+        self.vacation_calendar = vacation_calendar
+        self.holidays = holidays or []
+
+    async def _async_update_data(self) -> ForecastData:
+        """Generate the total and per-meter forecasts."""
+        now = dt_util.now()
+        calendar = get_horizon_calendar(self.hass, now, self.holidays)
+        try:
+            forecast, meter_forecasts = await self.forecaster.generate_forecasts(
+                now,
+                self.energy_meters,
+                self.excluded_entities,
+                self.vacation_calendar,
+                calendar,
+            )
+        except Exception as err:
+            raise UpdateFailed(f"Error generating forecast: {err}") from err
+
+        return ForecastData(now, calendar, forecast, meter_forecasts)
@@ -0,0 +1,146 @@
+"""Export forecasts and history for external optimizers."""
+import csv
+import json
+import logging
+import os
+import struct
+import tempfile
+from typing import IO, Callable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Little-endian header: magic, version, series, start epoch, step seconds, count
+FORECAST_HEADER = struct.Struct("<4sHHqII")
+FORECAST_MAGIC = b"EFCF"
+FORECAST_VERSION = 1
+FORECAST_STEP = 3600
+
+HISTORY_FORMATS = ["csv", "jsonl"]
+HISTORY_FIELDS = ["time", "entity_id", "actual", "forecast"]
+
+
+def _write_atomic(path: str, write: Callable[[IO], None], binary: bool) -> None:
+    """Write a file next to path and move it into place."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb" if binary else "w", newline=None if binary else "") as file:
+            write(file)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_forecast_file(
+    path: str,
+    start_epoch: float,
+    levels: Sequence[float],
+    values: np.ndarray,
+) -> None:
+    """Atomically replace path with a fixed-layout forecast file.
+
+    The header is followed by one float32 quantile level per series (NaN for
+    the forecast of the configured aggregation) and the (series x count)
+    float32 values, row-major.
+    """
+    values = np.ascontiguousarray(values, dtype="<f4")
+    header = FORECAST_HEADER.pack(
+        FORECAST_MAGIC,
+        FORECAST_VERSION,
+        values.shape[0],
+        int(start_epoch),
+        FORECAST_STEP,
+        values.shape[1],
+    )
+
+    def write(file: IO) -> None:
+        file.write(header)
+        file.write(np.asarray(levels, dtype="<f4").tobytes())
+        file.write(values.tobytes())
+
+    _write_atomic(path, write, binary=True)
+
+
+def remove_file(path: str) -> None:
+    """Remove a file if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def write_history_file(path: str, file_format: str, rows: Iterable[dict]) -> None:
+    """Stream history rows to a CSV or JSON-lines file."""
+    def write(file: IO) -> None:
+        if file_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=HISTORY_FIELDS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+        else:
+            for row in rows:
+                file.write(json.dumps(row))
+                file.write("\n")
+
+    _write_atomic(path, write, binary=False)
+
+
+class ForecastExporter:
+    """Write forecasts and history of a config entry to the config directory."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, forecast_enabled: bool) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self.forecast_enabled = forecast_enabled
+        self.forecast_path = hass.config.path(DOMAIN, f"{entry_id}.forecast.bin")
+
+    def history_path(self, file_format: str) -> str:
+        """Return the path of the history export."""
+        return self.hass.config.path(DOMAIN, f"{self.entry_id}.history.{file_format}")
+
+    async def async_export_forecast(
+        self,
+        start_epoch: float,
+        levels: Sequence[float],
+        values: np.ndarray,
+    ) -> None:
+        """Write the forecast file."""
+        if not self.forecast_enabled:
+            return
+
+        try:
+            await self.hass.async_add_executor_job(
+                write_forecast_file, self.forecast_path, start_epoch, levels, values
+            )
+        except OSError as err:
+            _LOGGER.error("Error writing forecast export %s: %s", self.forecast_path, err)
+
+    async def async_remove_forecast(self) -> None:
+        """Remove the forecast file so readers do not act on a stale forecast."""
+        try:
+            await self.hass.async_add_executor_job(remove_file, self.forecast_path)
+        except OSError as err:
+            _LOGGER.error("Error removing forecast export %s: %s", self.forecast_path, err)
+
+    async def async_export_history(
+        self, file_format: str, rows: Iterator[dict]
+    ) -> Optional[str]:
+        """Stream history rows to the history export and return its path."""
+        path = self.history_path(file_format)
+        try:
+            await self.hass.async_add_executor_job(
+                write_history_file, path, file_format, rows
+            )
+        except OSError as err:
+            _LOGGER.error("Error writing history export %s: %s", path, err)
+            return None
+        return path
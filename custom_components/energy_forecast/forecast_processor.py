@@ -1,15 +1,53 @@
 """Process and generate energy consumption forecasts."""
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import warnings
+
+import numpy as np
 
 from homeassistant.components.recorder import get_instance
 from homeassistant.components.recorder.statistics import statistics_during_period
 from homeassistant.core import HomeAssistant
 from homeassistant.util import dt as dt_util
 
+from .aggregation import aggregate_buckets
+from .const import (
+    AGGREGATION_MEAN,
+    DAY_TYPE_HOLIDAY,
+    DAY_TYPE_WEEKEND,
+    DAY_TYPES,
+    HOURS_PER_DAY,
+    SECONDS_PER_HOUR,
+)
+from .horizon_calendar import HorizonCalendar
+
 _LOGGER = logging.getLogger(__name__)
 
+
+def _stat_start(stat: dict) -> Optional[datetime]:
+    """Return the start of a statistics row as a datetime."""
+    start = stat["start"]
+    if isinstance(start, (int, float)):
+        return dt_util.utc_from_timestamp(start)
+    if isinstance(start, str):
+        return dt_util.parse_datetime(start)
+    return start
+
+
+def _stat_epochs(stats: List[dict]) -> np.ndarray:
+    """Return the start of every statistics row as epoch seconds."""
+    if isinstance(stats[0]["start"], (int, float)):
+        return np.fromiter((stat["start"] for stat in stats), dtype=float, count=len(stats))
+    starts = [_stat_start(stat) for stat in stats]
+    return np.array([start.timestamp() if start else np.nan for start in starts])
+
+
+def observed_entities(values: np.ndarray) -> np.ndarray:
+    """Return which rows of a (entities x days x 24) array observed any hour."""
+    return ~np.isnan(values).all(axis=(1, 2))
+
+
 class ForecastProcessor:
     """Process historical data and generate forecasts."""
 
@@ -19,90 +57,201 @@ class ForecastProcessor:
 
     async def get_historical_stats(
         self,
-        entity_id: str,
+        entity_ids: List[str],
         start_date: datetime,
         end_date: datetime,
-    ) -> List[dict]:
-        """Fetch historical statistics for an entity."""
+    ) -> Dict[str, List[dict]]:
+        """Fetch historical statistics for all entities in a single query."""
         try:
             stats = await get_instance(self.hass).async_add_executor_job(
                 statistics_during_period,
                 self.hass,
                 start_date,
                 end_date,
-                {entity_id},
+                set(entity_ids),
                 "hour",
                 None,
                 {"sum"}
             )
-            
-            if entity_id in stats:
-                return stats[entity_id]
-            
-            _LOGGER.warning("No statistics found for entity: %s", entity_id)
-            return []
-            
         except Exception as err:
             _LOGGER.error("Error fetching statistics: %s", err)
-            return []
+            return {}
+
+        for entity_id in entity_ids:
+            if not stats.get(entity_id):
+                _LOGGER.warning("No statistics found for entity: %s", entity_id)
+
+        return stats
 
     async def get_vacation_dates(self, calendar_entity_id: str) -> Set[datetime.date]:
         """Get vacation dates from calendar."""
         vacation_dates = set()
         calendar = self.hass.states.get(calendar_entity_id)
-        
+
         if calendar is not None and calendar.attributes.get("events"):
             for event in calendar.attributes["events"]:
                 start = dt_util.parse_datetime(event["start"])
                 end = dt_util.parse_datetime(event["end"])
-                
+
                 if start and end:
                     current = start
                     while current <= end:
                         vacation_dates.add(current.date())
                         current += timedelta(days=1)
-        
+
         return vacation_dates
 
-    def process_historical_data(
+    def build_hourly_array(
         self,
-        stats: Dict[datetime, float],
-        vacation_dates: Set[datetime.date] = None
-    ) -> tuple[List[List[float]], List[List[float]]]:
-        """Process historical data into weekday and weekend averages."""
-        weekday_hourly = [[] for _ in range(24)]
-        weekend_hourly = [[] for _ in range(24)]
-        
-        for timestamp, value in stats.items():
-            if vacation_dates and timestamp.date() in vacation_dates:
+        stats: Dict[str, List[dict]],
+        entity_ids: List[str],
+        calendar: HorizonCalendar,
+        days: int,
+    ) -> np.ndarray:
+        """Arrange hourly consumption into a (meters x days x 24) array.
+
+        The cumulative ``sum`` statistic of each meter is differenced between
+        consecutive hours before it is placed on the local day and hour of the
+        horizon calendar. Rows follow the order of ``entity_ids`` and days
+        start at the calendar's first day. Hours without a statistic, after a
+        gap or with a meter reset are NaN.
+        """
+        meter_idx: List[np.ndarray] = []
+        day_idx: List[np.ndarray] = []
+        hour_idx: List[np.ndarray] = []
+        values: List[np.ndarray] = []
+
+        for row, entity_id in enumerate(entity_ids):
+            rows = stats.get(entity_id) or []
+            if len(rows) < 2:
                 continue
-                
-            hour = timestamp.hour
-            if timestamp.weekday() < 5:  # Weekday
-                weekday_hourly[hour].append(value)
-            else:  # Weekend
-                weekend_hourly[hour].append(value)
-                
-        return weekday_hourly, weekend_hourly
+
+            epochs = _stat_epochs(rows)
+            deltas = np.diff(np.array([stat.get("sum") for stat in rows], dtype=float))
+            # Only consecutive hours give a delta; a drop in the sum is a reset
+            valid = (np.diff(epochs) == SECONDS_PER_HOUR) & (deltas >= 0)
+
+            day, hour = calendar.local_day_hour(epochs[1:][valid])
+            inside = (day >= 0) & (day < days)
+            meter_idx.append(np.full(np.count_nonzero(inside), row, dtype=np.intp))
+            day_idx.append(day[inside])
+            hour_idx.append(hour[inside])
+            values.append(deltas[valid][inside])
+
+        shape = (len(entity_ids), days, HOURS_PER_DAY)
+        totals = np.zeros(shape)
+        seen = np.zeros(shape, dtype=bool)
+        if values:
+            index = (
+                np.concatenate(meter_idx),
+                np.concatenate(day_idx),
+                np.concatenate(hour_idx),
+            )
+            # Accumulate so the repeated local hour on a DST change is not lost
+            np.add.at(totals, index, np.concatenate(values))
+            seen[index] = True
+
+        return np.where(seen, totals, np.nan)
+
+    def subtract_sub_meters(
+        self,
+        meter_values: np.ndarray,
+        sub_meter_values: np.ndarray,
+    ) -> np.ndarray:
+        """Return the net consumption of the meters minus their sub-meters.
+
+        Both arrays share the same (days x 24) hour index. Meters and
+        sub-meters without any observed hour are left out. The net of an hour
+        is NaN unless every remaining meter and sub-meter observed it, so a gap
+        in one of them does not bias the total. The result is clipped at zero.
+        """
+        meter_values = meter_values[observed_entities(meter_values)]
+        sub_meter_values = sub_meter_values[observed_entities(sub_meter_values)]
+        if not len(meter_values):
+            return np.full(sub_meter_values.shape[1:], np.nan)
+
+        net = meter_values.sum(axis=0) - sub_meter_values.sum(axis=0)
+        return np.where(np.isnan(net), np.nan, np.maximum(net, 0))
+
+    def process_historical_data(
+        self,
+        values: np.ndarray,
+        calendar: HorizonCalendar,
+        vacation_dates: Set[datetime.date] = None,
+        aggregation: str = AGGREGATION_MEAN,
+    ) -> np.ndarray:
+        """Process a (meters x days x 24) array into hourly averages per day type.
+
+        Days are typed by the horizon calendar, starting at its first day, and
+        each hourly bucket is aggregated with the given mode. Returns a
+        (day types x meters x 24) array. Holidays fall back to the weekend
+        averages while the history holds no complete holiday.
+        """
+        day_masks = self._day_type_masks(values.shape[1], calendar, vacation_dates)
+        profiles = np.stack([
+            aggregate_buckets(values[:, mask, :], aggregation) for mask in day_masks
+        ])
+        if not day_masks[DAY_TYPE_HOLIDAY].any():
+            profiles[DAY_TYPE_HOLIDAY] = profiles[DAY_TYPE_WEEKEND]
+        return profiles
+
+    def process_historical_quantiles(
+        self,
+        values: np.ndarray,
+        calendar: HorizonCalendar,
+        vacation_dates: Set[datetime.date],
+        levels: Sequence[float],
+    ) -> np.ndarray:
+        """Process a (days x 24) array into hourly quantiles per day type.
+
+        Returns a (day types x levels x 24) array, with the same day typing
+        and holiday fallback as the averages.
+        """
+        day_masks = self._day_type_masks(values.shape[0], calendar, vacation_dates)
+        with warnings.catch_warnings():
+            # Hours without any data give NaN, reported as zero below
+            warnings.simplefilter("ignore", RuntimeWarning)
+            quantiles = np.stack([
+                np.nanquantile(values[mask], levels, axis=0)
+                if mask.any() else np.full((len(levels), HOURS_PER_DAY), np.nan)
+                for mask in day_masks
+            ])
+        if not day_masks[DAY_TYPE_HOLIDAY].any():
+            quantiles[DAY_TYPE_HOLIDAY] = quantiles[DAY_TYPE_WEEKEND]
+        return np.nan_to_num(quantiles)
+
+    @staticmethod
+    def _day_type_masks(
+        days: int,
+        calendar: HorizonCalendar,
+        vacation_dates: Optional[Set[datetime.date]],
+    ) -> List[np.ndarray]:
+        """Return a mask of the usable history days for each day type.
+
+        Today is not complete yet, so it never counts towards a profile; a
+        holiday today would otherwise replace the weekend fallback with its
+        first few hours.
+        """
+        day_types = calendar.day_types[:days]
+        usable = np.array([
+            day < calendar.today and (not vacation_dates or day not in vacation_dates)
+            for day in calendar.dates[:days]
+        ])
+        return [usable & (day_types == day_type) for day_type in range(DAY_TYPES)]
 
     def generate_hourly_forecast(
         self,
         current_time: datetime,
-        weekday_data: List[List[float]],
-        weekend_data: List[List[float]],
-    ) -> Dict[str, float]:
-        """Generate hourly forecast for the next 24 hours."""
-        forecast = {}
-        
-        for hour_offset in range(24):
-            forecast_time = current_time + timedelta(hours=hour_offset)
-            hour = forecast_time.hour
-            is_weekend = forecast_time.weekday() >= 5
-            
-            values = weekend_data[hour] if is_weekend else weekday_data[hour]
-            avg_value = sum(values) / len(values) if values else 0
-            
-            timestamp = forecast_time.strftime("%Y-%m-%dT%H:00:00")
-            forecast[timestamp] = round(avg_value, 2)
-            
-        return forecast
\ No newline at end of file
+        calendar: HorizonCalendar,
+        profiles: np.ndarray,
+    ) -> Tuple[List[str], np.ndarray]:
+        """Generate hourly forecast for the next 24 hours.
+
+        Hours and day types are read from the horizon calendar. ``profiles``
+        is a (day types x series x 24) array. Returns the forecast timestamps
+        and a (series x 24) array of values.
+        """
+        first_row = calendar.row(current_time)
+        rows = slice(first_row, first_row + HOURS_PER_DAY)
+        values = profiles[calendar.row_day_types[rows], :, calendar.hours[rows]]
+        return calendar.timestamps[rows], values.T
@@ -1,22 +1,52 @@
 """Forecasting logic for energy consumption."""
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
 
 from homeassistant.core import HomeAssistant
-from homeassistant.util import dt as dt_util
 
-from .forecast_processor import ForecastProcessor
+from .const import AGGREGATION_MEAN, EXPORT_QUANTILES, HISTORY_DAYS
+from .forecast_export import ForecastExporter
+from .forecast_processor import ForecastProcessor, observed_entities
+from .horizon_calendar import HorizonCalendar, get_horizon_calendar
 
 _LOGGER = logging.getLogger(__name__)
 
+# Entity id of the net total in the forecast history
+TOTAL = "total"
+
+
+def _to_forecast(timestamps: List[str], values: np.ndarray) -> Dict[str, float]:
+    """Map forecast timestamps to rounded values."""
+    return dict(zip(timestamps, np.round(values, 2).tolist()))
+
+
+class ForecastHistory(NamedTuple):
+    """Hourly history and profiles behind the latest forecast."""
+
+    entity_ids: List[str]
+    calendar: HorizonCalendar
+    values: np.ndarray
+    profiles: np.ndarray
+
+
 class EnergyForecaster:
     """Class to handle energy consumption forecasting."""
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        exporter: Optional[ForecastExporter] = None,
+        aggregation: str = AGGREGATION_MEAN,
+    ) -> None:
         """Initialize the forecaster."""
         self.hass = hass
         self.processor = ForecastProcessor(hass)
+        self.exporter = exporter
+        self.aggregation = aggregation
+        self.history: Optional[ForecastHistory] = None
 
     async def generate_forecast(
         self,
@@ -24,50 +54,138 @@ class EnergyForecaster:
         energy_meters: List[str],
         excluded_entities: List[str],
         vacation_calendar: Optional[str],
+        calendar: Optional[HorizonCalendar] = None,
+        history_days: int = HISTORY_DAYS,
     ) -> Dict[str, float]:
         """Generate hourly consumption forecast for the next 24 hours."""
+        forecast, _ = await self.generate_forecasts(
+            current_time,
+            energy_meters,
+            excluded_entities,
+            vacation_calendar,
+            calendar,
+            history_days,
+        )
+        return forecast
+
+    async def generate_forecasts(
+        self,
+        current_time: datetime,
+        energy_meters: List[str],
+        excluded_entities: List[str],
+        vacation_calendar: Optional[str],
+        calendar: Optional[HorizonCalendar] = None,
+        history_days: int = HISTORY_DAYS,
+    ) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+        """Generate the total and per-meter forecasts for the next 24 hours.
+
+        All meters and excluded sub-meters are fetched in one statistics query
+        and processed as a single (meters x days x 24) array of hourly
+        consumption. The total is the meters' consumption minus the excluded
+        sub-meters, aligned on the same hour. Day types and forecast hours are
+        read from the shared horizon calendar. A shorter ``history_days``
+        bounds the query to the most recent days.
+        """
         _LOGGER.debug(
             "Generating forecast for energy_meters: %s, excluded_entities: %s, vacation_calendar: %s",
             energy_meters, excluded_entities, vacation_calendar
         )
-        
-        # Get historical data for the past 30 days
-        start_date = current_time - timedelta(days=30)
-        
+
+        meters = [meter for meter in energy_meters if meter not in excluded_entities]
+        sub_meters = [entity for entity in excluded_entities if entity not in energy_meters]
+
+        if calendar is None:
+            calendar = get_horizon_calendar(self.hass, current_time)
+
+        # Get historical data for the past days
+        start_date = current_time - timedelta(days=min(history_days, HISTORY_DAYS))
+        days = (calendar.today - calendar.first_day).days + 1
+
         # Get vacation dates if calendar is configured
         vacation_dates = set()
         if vacation_calendar:
             vacation_dates = await self.processor.get_vacation_dates(vacation_calendar)
             _LOGGER.debug("Found vacation dates: %s", vacation_dates)
-        
-        # Get historical statistics for all energy meters
-        combined_stats = {}
-        for meter in energy_meters:
-            if meter not in excluded_entities:
-                stats = await self.processor.get_historical_stats(
-                    meter, start_date, current_time
-                )
-                for stat in stats:
-                    start = dt_util.parse_datetime(stat["start"])
-                    if start:
-                        if start in combined_stats:
-                            combined_stats[start] += stat["sum"]
-                        else:
-                            combined_stats[start] = stat["sum"]
-        
-        if not combined_stats:
+
+        # Get historical statistics for all energy meters and sub-meters
+        stats = await self.processor.get_historical_stats(
+            meters + sub_meters, start_date, current_time
+        )
+
+        if not any(stats.get(meter) for meter in meters):
             _LOGGER.warning("No historical statistics found for entities: %s", energy_meters)
-            return {}
-        
-        # Process historical data
-        weekday_hourly, weekend_hourly = self.processor.process_historical_data(
-            combined_stats, vacation_dates
+            return {}, {}
+
+        # Process historical data, with the net total as the last row
+        entity_ids = meters + sub_meters
+        values = self.processor.build_hourly_array(stats, entity_ids, calendar, days)
+        unobserved = [
+            entity_ids[row] for row in np.flatnonzero(~observed_entities(values))
+        ]
+        if unobserved:
+            _LOGGER.warning(
+                "No hourly consumption in the history of %s, leaving them out of the total",
+                unobserved,
+            )
+
+        meter_values = values[:len(meters)]
+        net_values = self.processor.subtract_sub_meters(
+            meter_values, values[len(meters):]
         )
-        
+        rows = np.concatenate([meter_values, net_values[np.newaxis]])
+
+        profiles = self.processor.process_historical_data(
+            rows, calendar, vacation_dates, self.aggregation
+        )
+
         # Generate forecast
-        forecast = self.processor.generate_hourly_forecast(
-            current_time, weekday_hourly, weekend_hourly
+        timestamps, row_values = self.processor.generate_hourly_forecast(
+            current_time, calendar, profiles
         )
-        
+
+        self.history = ForecastHistory(meters + [TOTAL], calendar, rows, profiles)
+        if self.exporter is not None and self.exporter.forecast_enabled:
+            quantiles = self.processor.process_historical_quantiles(
+                net_values, calendar, vacation_dates, EXPORT_QUANTILES
+            )
+            _, quantile_values = self.processor.generate_hourly_forecast(
+                current_time, calendar, quantiles
+            )
+            await self.exporter.async_export_forecast(
+                calendar.epochs[calendar.row(current_time)],
+                [np.nan] + EXPORT_QUANTILES,
+                np.concatenate([row_values[-1:], quantile_values]),
+            )
+
+        forecast = _to_forecast(timestamps, row_values[-1])
+        meter_forecasts = {
+            meter: _to_forecast(timestamps, row_values[row])
+            for row, meter in enumerate(meters)
+        }
+
         _LOGGER.debug("Generated forecast: %s", forecast)
-        return forecast
\ No newline at end of file
+        return forecast, meter_forecasts
+
+    def iter_history(self) -> Iterator[dict]:
+        """Yield the actual and profile value of every history hour and entity.
+
+        The profile value is the in-sample forecast of that hour, so the rows
+        can be used to backtest the model.
+        """
+        if self.history is None:
+            return
+
+        entity_ids, calendar, values, profiles = self.history
+        for day in range(values.shape[1]):
+            day_type = calendar.day_types[day]
+            day_iso = calendar.dates[day].isoformat()
+            for hour in range(values.shape[2]):
+                time = f"{day_iso}T{hour:02d}:00:00"
+                for row, entity_id in enumerate(entity_ids):
+                    actual = values[row, day, hour]
+                    yield {
+                        "time": time,
+                        "entity_id": entity_id,
+                        "actual": None if np.isnan(actual) else round(float(actual), 3),
+                        "forecast": round(float(profiles[day_type, row, hour]), 3),
+                    }
@@ -0,0 +1,169 @@
+"""Calendar of the forecast horizon shared by all forecast sensors."""
+from datetime import date, datetime, timedelta
+import logging
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from homeassistant.const import SUN_EVENT_SUNRISE, SUN_EVENT_SUNSET
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.sun import get_astral_event_date
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    DATA_HORIZON_CALENDARS,
+    DAY_TYPE_HOLIDAY,
+    DAY_TYPE_WEEKDAY,
+    DAY_TYPE_WEEKEND,
+    HISTORY_DAYS,
+    HOURS_PER_DAY,
+    SECONDS_PER_DAY,
+    SECONDS_PER_HOUR,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalize_holiday(value: str) -> Optional[str]:
+    """Return a holiday as YYYY-MM-DD or yearly MM-DD, or None if invalid."""
+    value = value.strip()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    try:
+        # Parse with a leap year so that 02-29 is accepted
+        return datetime.strptime(f"2000-{value}", "%Y-%m-%d").strftime("%m-%d")
+    except ValueError:
+        return None
+
+
+class HorizonCalendar:
+    """Day types and hourly rows for today and tomorrow.
+
+    The day type of every day from the start of the history window until
+    tomorrow is stored in ``day_types``. The horizon covers today and tomorrow
+    with one row per local hour, holding its timestamp, hour of day and day
+    type. ``sunset_slot`` and ``sunrise_slot`` are the number of rows starting
+    before today's sunset and tomorrow's sunrise.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        today: date,
+        holidays: Iterable[str],
+    ) -> None:
+        """Build the calendar for today."""
+        self.today = today
+        self.first_day = today - timedelta(days=HISTORY_DAYS)
+        self._holidays = frozenset(
+            holiday for holiday in map(normalize_holiday, holidays) if holiday
+        )
+
+        self.dates = [self.first_day + timedelta(days=day) for day in range(HISTORY_DAYS + 2)]
+        self.day_types = np.array([self._day_type(day) for day in self.dates], dtype=np.intp)
+
+        # UTC offsets over the window, to place epochs on local days and hours
+        self._transitions, self._offsets = self._utc_offset_transitions()
+        first_midnight = dt_util.start_of_local_day(self.first_day)
+        self._local_origin = (
+            first_midnight.timestamp() + first_midnight.utcoffset().total_seconds()
+        )
+
+        # Step in UTC so DST days get 23 or 25 rows
+        starts: List[datetime] = []
+        current = dt_util.as_utc(dt_util.start_of_local_day(today))
+        end = dt_util.as_utc(dt_util.start_of_local_day(today + timedelta(days=2)))
+        while current < end:
+            starts.append(dt_util.as_local(current))
+            current += timedelta(hours=1)
+
+        self.timestamps = [start.strftime("%Y-%m-%dT%H:00:00") for start in starts]
+        self.epochs = np.array([start.timestamp() for start in starts])
+        self.hours = np.array([start.hour for start in starts], dtype=np.intp)
+        self.row_day_types = self.day_types[
+            [(start.date() - self.first_day).days for start in starts]
+        ]
+        self.tomorrow_row = sum(1 for start in starts if start.date() == today)
+
+        sunset = get_astral_event_date(hass, SUN_EVENT_SUNSET, today)
+        sunrise = get_astral_event_date(hass, SUN_EVENT_SUNRISE, today + timedelta(days=1))
+        self.sunset_slot = self.slot(sunset) if sunset else None
+        self.sunrise_slot = self.slot(sunrise) if sunrise else None
+
+        _LOGGER.debug(
+            "Built horizon calendar for %s with %d rows, sunset slot %s, sunrise slot %s",
+            today, len(starts), self.sunset_slot, self.sunrise_slot
+        )
+
+    def _day_type(self, day: date) -> int:
+        """Return the day type of a date."""
+        if day.isoformat() in self._holidays or day.strftime("%m-%d") in self._holidays:
+            return DAY_TYPE_HOLIDAY
+        if day.weekday() >= 5:
+            return DAY_TYPE_WEEKEND
+        return DAY_TYPE_WEEKDAY
+
+    def _utc_offset_transitions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the epochs where the UTC offset changes and the offsets.
+
+        ``offsets[0]`` applies before the first transition and ``offsets[i]``
+        from transition ``i - 1`` on. Only days whose midnights have different
+        offsets are searched hour by hour.
+        """
+        midnights = [
+            dt_util.start_of_local_day(self.first_day + timedelta(days=day))
+            for day in range(len(self.dates) + 1)
+        ]
+        transitions: List[float] = []
+        offsets = [midnights[0].utcoffset().total_seconds()]
+
+        for midnight, next_midnight in zip(midnights, midnights[1:]):
+            offset = next_midnight.utcoffset().total_seconds()
+            if offset == offsets[-1]:
+                continue
+            epoch = midnight.timestamp()
+            while epoch < next_midnight.timestamp():
+                local = dt_util.as_local(dt_util.utc_from_timestamp(epoch))
+                if local.utcoffset().total_seconds() == offset:
+                    break
+                epoch += SECONDS_PER_HOUR
+            transitions.append(epoch)
+            offsets.append(offset)
+
+        return np.array(transitions), np.array(offsets)
+
+    def local_day_hour(self, epochs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the local day index from ``first_day`` and hour of epochs."""
+        offsets = self._offsets[np.searchsorted(self._transitions, epochs, side="right")]
+        local = epochs + offsets - self._local_origin
+        days = np.floor_divide(local, SECONDS_PER_DAY).astype(np.intp)
+        hours = (np.floor_divide(local, SECONDS_PER_HOUR) % HOURS_PER_DAY).astype(np.intp)
+        return days, hours
+
+    def row(self, moment: datetime) -> int:
+        """Return the row of the hour containing moment."""
+        return int(np.searchsorted(self.epochs, moment.timestamp(), side="right")) - 1
+
+    def slot(self, moment: datetime) -> int:
+        """Return the number of rows starting before moment."""
+        return int(np.searchsorted(self.epochs, moment.timestamp(), side="left"))
+
+
+@callback
+def get_horizon_calendar(
+    hass: HomeAssistant,
+    now: datetime,
+    holidays: Optional[Iterable[str]] = None,
+) -> HorizonCalendar:
+    """Return the shared calendar for today, building it once per day."""
+    calendars = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HORIZON_CALENDARS, {})
+    key = frozenset(holidays or ())
+    today = dt_util.as_local(now).date()
+
+    calendar = calendars.get(key)
+    if calendar is None or calendar.today != today:
+        calendar = calendars[key] = HorizonCalendar(hass, today, key)
+    return calendar
@@ -6,11 +6,21 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
+    DOMAIN,
+    DATA_COORDINATOR,
+    DATA_FORECASTER,
+    AGGREGATION_MEAN,
+    CONF_AGGREGATION,
     CONF_ENERGY_METERS,
     CONF_EXCLUDED_ENTITIES,
+    CONF_FORECAST_EXPORT,
+    CONF_HOLIDAYS,
+    CONF_METER_FORECASTS,
     CONF_VACATION_CALENDAR,
     SENSOR_TYPES,
 )
+from .coordinator import EnergyForecastCoordinator
+from .forecast_export import ForecastExporter
 from .forecaster import EnergyForecaster
 from .sensor_entity import SENSOR_CLASSES
 
@@ -24,24 +34,32 @@ async def setup_platform(
     """Set up the platform with config entry."""
     _LOGGER.debug("Setting up Energy Forecast sensors with config: %s", config_entry.data)
     
-    energy_meters = config_entry.data[CONF_ENERGY_METERS]
-    excluded_entities = config_entry.data.get(CONF_EXCLUDED_ENTITIES, [])
-    vacation_calendar = config_entry.data.get(CONF_VACATION_CALENDAR)
+    config = {**config_entry.data, **config_entry.options}
+    energy_meters = config[CONF_ENERGY_METERS]
+    excluded_entities = config.get(CONF_EXCLUDED_ENTITIES, [])
+    vacation_calendar = config.get(CONF_VACATION_CALENDAR)
+    meter_forecasts = config.get(CONF_METER_FORECASTS, False)
+    holidays = config.get(CONF_HOLIDAYS, [])
+    forecast_export = config.get(CONF_FORECAST_EXPORT, False)
+    aggregation = config.get(CONF_AGGREGATION, AGGREGATION_MEAN)
 
-    forecaster = EnergyForecaster(hass)
+    exporter = ForecastExporter(hass, config_entry.entry_id, forecast_export)
+    forecaster = EnergyForecaster(hass, exporter, aggregation)
+    coordinator = EnergyForecastCoordinator(
+        hass,
+        forecaster,
+        energy_meters,
+        excluded_entities,
+        vacation_calendar,
+        holidays,
+    )
+    await coordinator.async_refresh()
+    hass.data[DOMAIN][config_entry.entry_id][DATA_FORECASTER] = forecaster
+    hass.data[DOMAIN][config_entry.entry_id][DATA_COORDINATOR] = coordinator
     
     entities = []
     for sensor_type in SENSOR_TYPES:
         sensor_class = SENSOR_CLASSES[sensor_type]
-        entities.append(
-            sensor_class(
-                hass,
-                forecaster,
-                energy_meters,
-                excluded_entities,
-                vacation_calendar,
-                sensor_type
-            )
-        )
+        entities.append(sensor_class(coordinator, sensor_type, meter_forecasts))
     
     async_add_entities(entities)
\ No newline at end of file
@@ -16,7 +16,6 @@ from .forecaster import EnergyForecaster
 
 _LOGGER = logging.getLogger(__name__)
 """Energy Forecast sensor entity implementation."""
-from datetime import datetime, timedelta
 import logging
 from typing import Any, Optional
 
@@ -27,8 +26,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import UnitOfEnergy
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_interval
-from homeassistant.helpers.sun import get_astral_event_date
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -36,40 +34,35 @@ from .const import (
     DEFAULT_NAME,
     SENSOR_TYPES,
     ATTR_FORECAST_TIME,
+    ATTR_METER_FORECASTS,
 )
+from .coordinator import EnergyForecastCoordinator, ForecastData
 from .forecaster import EnergyForecaster
+from .horizon_calendar import HorizonCalendar
 
 _LOGGER = logging.getLogger(__name__)
 
-class EnergyForecastSensorBase(SensorEntity):
+class EnergyForecastSensorBase(CoordinatorEntity[EnergyForecastCoordinator], SensorEntity):
     """Base class for Energy Consumption Forecast Sensors."""
 
     _attr_has_entity_name = True
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_should_poll = False
 
     def __init__(
         self,
-        hass: HomeAssistant,
-        forecaster: EnergyForecaster,
-        energy_meters: list[str],
-        excluded_entities: list[str],
-        vacation_calendar: Optional[str],
+        coordinator: EnergyForecastCoordinator,
         sensor_type: str,
+        meter_forecasts: bool = False,
     ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self.forecaster = forecaster
-        self._energy_meters = energy_meters
-        self._excluded_entities = excluded_entities
-        self._vacation_calendar = vacation_calendar
+        super().__init__(coordinator)
         self._sensor_type = sensor_type
-        self._forecast_data = {}
+        self._show_meter_forecasts = meter_forecasts
         
         # Set up unique ID and entity ID
-        base_id = f"energy_forecast_{'_'.join(sorted(energy_meters))}"
+        base_id = f"energy_forecast_{'_'.join(sorted(coordinator.energy_meters))}"
         self._attr_unique_id = f"{base_id}_{sensor_type}"
         self.entity_id = f"sensor.energy_forecast_{sensor_type}"
         
@@ -87,137 +80,112 @@ class EnergyForecastSensorBase(SensorEntity):
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
-        await self.async_update()
-        self.async_schedule_update_ha_state(True)
-        
-        # Update every hour
-        self.async_on_remove(
-            async_track_time_interval(
-                self.hass,
-                self._async_update,
-                timedelta(hours=1)
-            )
-        )
+        await super().async_added_to_hass()
+        self._update_from_coordinator()
 
     @callback
-    async def _async_update(self, _now: Optional[datetime] = None) -> None:
-        """Update the sensor."""
-        await self.async_update()
-        self.async_write_ha_state()
-
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        try:
-            now = dt_util.now()
-            self._forecast_data = await self.forecaster.generate_forecast(
-                now,
-                self._energy_meters,
-                self._excluded_entities,
-                self._vacation_calendar,
-            )
-            
-            if self._forecast_data:
-                self._update_state(now)
-            else:
-                self._attr_native_value = None
-                
-        except Exception as err:
+    def _handle_coordinator_update(self) -> None:
+        """Update the sensor from the refreshed forecast."""
+        self._update_from_coordinator()
+        super()._handle_coordinator_update()
+
+    def _update_from_coordinator(self) -> None:
+        """Update the state from the coordinator's latest forecast."""
+        data = self.coordinator.data
+        if data is None or not data.forecast:
             self._attr_native_value = None
-            _LOGGER.error("Error updating Energy Forecast sensor: %s", err)
+            return
+
+        self._update_state(data)
+
+    def _update_state(self, data: ForecastData) -> None:
+        """Update the state from the forecast window of this sensor type."""
+        calendar = data.calendar
+        window = self._forecast_window(calendar, calendar.row(data.now))
+        if window is None:
+            self._attr_native_value = 0
+            return
 
-    def _update_state(self, now: datetime) -> None:
-        """Update the state based on sensor type."""
+        timestamps = calendar.timestamps[window[0]:window[1]]
+        self._attr_native_value = self._sum_consumption(data.forecast, timestamps)
+        attributes = {
+            ATTR_FORECAST_TIME: timestamps[0]
+        }
+        if self._show_meter_forecasts:
+            attributes[ATTR_METER_FORECASTS] = {
+                meter: self._sum_consumption(forecast, timestamps)
+                for meter, forecast in data.meter_forecasts.items()
+            }
+        self._attr_extra_state_attributes = attributes
+
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the first and end row of the forecast window, or None if empty."""
         raise NotImplementedError
 
-    def _sum_consumption(self, start_time: datetime, end_time: datetime) -> float:
-        """Sum consumption between two timestamps."""
-        total = 0.0
-        current = start_time
-        while current < end_time:
-            timestamp = current.strftime("%Y-%m-%dT%H:00:00")
-            if timestamp in self._forecast_data:
-                total += self._forecast_data[timestamp]
-            current += timedelta(hours=1)
-        return round(total, 2)
+    @staticmethod
+    def _sum_consumption(forecast: dict[str, float], timestamps: list[str]) -> float:
+        """Sum consumption over the given hourly timestamps."""
+        return round(sum(forecast.get(timestamp, 0.0) for timestamp in timestamps), 2)
 
 class EnergyForecastNextHour(EnergyForecastSensorBase):
     """Sensor for next hour forecast."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for next hour forecast."""
-        next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-        timestamp = next_hour.strftime("%Y-%m-%dT%H:00:00")
-        self._attr_native_value = self._forecast_data.get(timestamp)
-        self._attr_extra_state_attributes = {
-            ATTR_FORECAST_TIME: timestamp
-        }
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window of the next hour."""
+        return current_row + 1, current_row + 2
 
 class EnergyForecastToday(EnergyForecastSensorBase):
     """Sensor for today's total forecast."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for today's forecast."""
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        end = start + timedelta(days=1)
-        self._attr_native_value = self._sum_consumption(start, end)
-        self._attr_extra_state_attributes = {
-            ATTR_FORECAST_TIME: start.strftime("%Y-%m-%dT%H:00:00")
-        }
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window of today."""
+        return 0, calendar.tomorrow_row
 
 class EnergyForecastTodayRemaining(EnergyForecastSensorBase):
     """Sensor for remaining consumption today."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for remaining consumption today."""
-        start = now.replace(minute=0, second=0, microsecond=0)
-        end = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        self._attr_native_value = self._sum_consumption(start, end)
-        self._attr_extra_state_attributes = {
-            ATTR_FORECAST_TIME: start.strftime("%Y-%m-%dT%H:00:00")
-        }
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window from the current hour until midnight."""
+        return current_row, calendar.tomorrow_row
 
 class EnergyForecastTomorrow(EnergyForecastSensorBase):
     """Sensor for tomorrow's forecast."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for tomorrow's forecast."""
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        end = start + timedelta(days=1)
-        self._attr_native_value = self._sum_consumption(start, end)
-        self._attr_extra_state_attributes = {
-            ATTR_FORECAST_TIME: start.strftime("%Y-%m-%dT%H:00:00")
-        }
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window of tomorrow."""
+        return calendar.tomorrow_row, len(calendar.timestamps)
 
 class EnergyForecastTodayToSunset(EnergyForecastSensorBase):
     """Sensor for consumption until sunset today."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for consumption until sunset."""
-        start = now.replace(minute=0, second=0, microsecond=0)
-        sunset = get_astral_event_date(self.hass, "sunset", now.date())
-        if sunset and sunset > start:
-            self._attr_native_value = self._sum_consumption(start, sunset)
-            self._attr_extra_state_attributes = {
-                ATTR_FORECAST_TIME: start.strftime("%Y-%m-%dT%H:00:00")
-            }
-        else:
-            self._attr_native_value = 0
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window from the current hour until sunset."""
+        if calendar.sunset_slot is not None and calendar.sunset_slot > current_row:
+            return current_row, calendar.sunset_slot
+        return None
 
 class EnergyForecastTomorrowToSunrise(EnergyForecastSensorBase):
     """Sensor for consumption until sunrise tomorrow."""
 
-    def _update_state(self, now: datetime) -> None:
-        """Update state for consumption until sunrise tomorrow."""
-        tomorrow = now.date() + timedelta(days=1)
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
-        sunrise = get_astral_event_date(self.hass, "sunrise", tomorrow)
-        if sunrise and sunrise > start:
-            self._attr_native_value = self._sum_consumption(start, sunrise)
-            self._attr_extra_state_attributes = {
-                ATTR_FORECAST_TIME: start.strftime("%Y-%m-%dT%H:00:00")
-            }
-        else:
-            self._attr_native_value = 0
+    def _forecast_window(
+        self, calendar: HorizonCalendar, current_row: int
+    ) -> Optional[tuple[int, int]]:
+        """Return the window from midnight until sunrise tomorrow."""
+        if calendar.sunrise_slot is not None and calendar.sunrise_slot > calendar.tomorrow_row:
+            return calendar.tomorrow_row, calendar.sunrise_slot
+        return None
 
 SENSOR_CLASSES = {
     "next_hour": EnergyForecastNextHour,
@@ -0,0 +1,273 @@
+"""Load test for the Energy Consumption Forecast integration.
+
+Boots a minimal Home Assistant core with a stub recorder, sets up many
+config entries with many meters each through ``async_setup_entry`` and
+``platform_setup.setup_platform`` and runs hourly coordinator refreshes. Reports
+event loop lag percentiles, peak RSS, recorder calls and state writes so
+that architectural changes can be compared. ``--trace-memory`` also reports
+the peak traced Python memory; tracing slows every allocation, so lag from
+such a run is not comparable.
+
+Requires Home Assistant in the Python environment:
+
+    python scripts/load_test.py --entries 200 --meters 10 --hours 6
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import json
+import logging
+import math
+from pathlib import Path
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import Entity
+from homeassistant.util import dt as dt_util
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components"))
+
+from energy_forecast import async_setup, async_setup_entry, sensor  # noqa: E402
+from energy_forecast.const import (  # noqa: E402
+    CONF_ENERGY_METERS,
+    CONF_EXCLUDED_ENTITIES,
+    CONF_FORECAST_EXPORT,
+    CONF_METER_FORECASTS,
+    DATA_COORDINATOR,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+LAG_INTERVAL = 0.01
+
+
+class StubRecorder:
+    """Recorder stand-in that serves synthetic hourly statistics."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the stub recorder."""
+        self.hass = hass
+        self.calls = 0
+        self.rows = 0
+
+    async def async_add_executor_job(self, target: Any, *args: Any) -> Any:
+        """Run a recorder job in the executor like the real recorder."""
+        return await self.hass.async_add_executor_job(target, *args)
+
+    def statistics_during_period(
+        self,
+        hass: HomeAssistant,
+        start_time: datetime,
+        end_time: datetime,
+        statistic_ids: set[str],
+        period: str,
+        units: Any,
+        types: set[str],
+    ) -> dict[str, list[dict]]:
+        """Return cumulative hourly sums with a daily pattern for every id."""
+        self.calls += 1
+        start = int(start_time.timestamp()) // 3600 * 3600
+        hours = range(start, int(end_time.timestamp()), 3600)
+        result = {}
+        for number, statistic_id in enumerate(sorted(statistic_ids)):
+            total = 0.0
+            rows = []
+            for epoch in hours:
+                hour = epoch // 3600 % 24
+                total += 0.3 + 0.2 * math.sin((hour + number) / 24 * 2 * math.pi)
+                rows.append({"start": float(epoch), "sum": total})
+            result[statistic_id] = rows
+            self.rows += len(rows)
+        return result
+
+
+class StubConfigEntries:
+    """Config entry manager that forwards entries to the sensor platform."""
+
+    def __init__(self, hass: HomeAssistant, add_entities: Any) -> None:
+        """Initialize the stub manager."""
+        self.hass = hass
+        self.entries: list[SimpleNamespace] = []
+        self._add_entities = add_entities
+
+    def async_entries(self, domain: str) -> list[SimpleNamespace]:
+        """Return the loaded entries."""
+        return self.entries
+
+    async def async_forward_entry_setups(self, entry: SimpleNamespace, platforms: list[str]) -> None:
+        """Set up the sensor platform of an entry."""
+        await sensor.async_setup_entry(self.hass, entry, self._add_entities)
+
+
+def _config_entry(number: int, meters: int, per_meter: bool, export: bool) -> SimpleNamespace:
+    """Return a minimal config entry."""
+    return SimpleNamespace(
+        entry_id=f"load_test_{number}",
+        title=f"Load test {number}",
+        data={
+            CONF_ENERGY_METERS: [f"sensor.load_test_{number}_{meter}" for meter in range(meters)],
+            CONF_EXCLUDED_ENTITIES: [],
+            CONF_METER_FORECASTS: per_meter,
+            CONF_FORECAST_EXPORT: export,
+        },
+        options={},
+        async_on_unload=lambda func: None,
+        add_update_listener=lambda listener: None,
+    )
+
+
+async def _monitor_lag(samples: list[float]) -> None:
+    """Record how late the event loop wakes up a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(loop.time() - start - LAG_INTERVAL)
+
+
+def _percentile(samples: list[float], percent: float) -> float:
+    """Return a percentile of the samples in milliseconds."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))
+    return ordered[index] * 1000
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run the load test and return its measurements."""
+    config_dir = tempfile.mkdtemp(prefix="energy_forecast_load_test_")
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+    hass.config.latitude = 52.37
+    hass.config.longitude = 4.89
+    dt_util.set_default_time_zone(dt_util.get_time_zone(args.time_zone))
+
+    recorder = StubRecorder(hass)
+    entities: list[Entity] = []
+
+    def add_entities(new_entities: list[Entity]) -> None:
+        """Attach entities to hass with unique entity ids."""
+        for entity in new_entities:
+            entity.hass = hass
+            entity.entity_id = f"{entity.entity_id}_{len(entities)}"
+            entities.append(entity)
+
+    hass.config_entries = StubConfigEntries(hass, add_entities)
+
+    state_writes = 0
+    write_ha_state = Entity._async_write_ha_state
+
+    def count_state_write(self: Entity, *write_args: Any, **kwargs: Any) -> None:
+        """Count state writes before writing the state."""
+        nonlocal state_writes
+        state_writes += 1
+        write_ha_state(self, *write_args, **kwargs)
+
+    clock = {"now": dt_util.now().replace(minute=5, second=0, microsecond=0)}
+    lag_samples: list[float] = []
+
+    with patch(
+        "energy_forecast.forecast_processor.get_instance", return_value=recorder
+    ), patch(
+        "energy_forecast.forecast_processor.statistics_during_period",
+        recorder.statistics_during_period,
+    ), patch.object(
+        Entity, "_async_write_ha_state", count_state_write
+    ), patch(
+        "homeassistant.util.dt.now", lambda time_zone=None: clock["now"]
+    ):
+        if args.trace_memory:
+            tracemalloc.start()
+        lag_task = asyncio.create_task(_monitor_lag(lag_samples))
+        started = time.perf_counter()
+
+        await async_setup(hass, {})
+        for number in range(args.entries):
+            entry = _config_entry(number, args.meters, args.per_meter, args.export)
+            hass.config_entries.entries.append(entry)
+            await async_setup_entry(hass, entry)
+        for entity in entities:
+            await entity.async_added_to_hass()
+        await hass.async_block_till_done()
+        setup_seconds = time.perf_counter() - started
+
+        for _ in range(args.hours):
+            clock["now"] += timedelta(hours=1)
+            await asyncio.gather(*(
+                hass.data[DOMAIN][entry.entry_id][DATA_COORDINATOR].async_refresh()
+                for entry in hass.config_entries.entries
+            ))
+            await hass.async_block_till_done()
+
+        total_seconds = time.perf_counter() - started
+        lag_task.cancel()
+        if args.trace_memory:
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    await hass.async_stop(force=True)
+
+    results = {
+        "entries": args.entries,
+        "meters_per_entry": args.meters,
+        "entities": len(entities),
+        "hours": args.hours,
+        "setup_seconds": round(setup_seconds, 3),
+        "total_seconds": round(total_seconds, 3),
+        "loop_lag_ms": {
+            f"p{percent}": round(_percentile(lag_samples, percent), 3)
+            for percent in (50, 90, 99, 100)
+        },
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "recorder_calls": recorder.calls,
+        "recorder_rows": recorder.rows,
+        "state_writes": state_writes,
+    }
+    if args.trace_memory:
+        results["peak_traced_memory_mb"] = round(peak_memory / 2**20, 1)
+    return results
+
+
+def main() -> None:
+    """Parse arguments, run the load test and print the measurements."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100, help="config entries to set up")
+    parser.add_argument("--meters", type=int, default=10, help="energy meters per entry")
+    parser.add_argument("--hours", type=int, default=6, help="hourly refresh cycles to simulate")
+    parser.add_argument("--time-zone", default="Europe/Amsterdam", help="time zone of the test hass")
+    parser.add_argument("--per-meter", action="store_true", help="enable per-meter forecasts")
+    parser.add_argument("--export", action="store_true", help="enable the forecast export")
+    parser.add_argument(
+        "--trace-memory", action="store_true", help="also trace Python memory (distorts lag)"
+    )
+    parser.add_argument("--json", action="store_true", help="print the measurements as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger("custom_components.energy_forecast").setLevel(logging.ERROR)
+    logging.getLogger("energy_forecast").setLevel(logging.ERROR)
+    # Entities are attached without an entity platform on purpose
+    logging.getLogger("homeassistant.helpers.entity").setLevel(logging.ERROR)
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for key, value in results.items():
+        print(f"{key:>24}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Fixtures for the Energy Consumption Forecast tests."""
+from datetime import date
+from pathlib import Path
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components"))
+
+from energy_forecast.horizon_calendar import HorizonCalendar  # noqa: E402
+
+
+@pytest.fixture
+def time_zone():
+    """Set the default time zone for a test and restore UTC afterwards."""
+    def set_time_zone(name: str) -> None:
+        dt_util.set_default_time_zone(dt_util.get_time_zone(name))
+
+    yield set_time_zone
+    dt_util.set_default_time_zone(dt_util.UTC)
+
+
+@pytest.fixture
+def make_calendar():
+    """Return a factory for horizon calendars without sun events."""
+    def factory(today: date, holidays: list[str] | None = None) -> HorizonCalendar:
+        with patch(
+            "energy_forecast.horizon_calendar.get_astral_event_date", return_value=None
+        ):
+            return HorizonCalendar(None, today, holidays or [])
+
+    return factory
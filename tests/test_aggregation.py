@@ -0,0 +1,71 @@
+"""Tests for the aggregation of hourly history buckets."""
+from datetime import date
+
+import numpy as np
+import pytest
+
+from energy_forecast.aggregation import aggregate_buckets
+from energy_forecast.const import (
+    AGGREGATION_MEAN,
+    AGGREGATION_MEDIAN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_WINSORIZED_MEAN,
+    AGGREGATIONS,
+)
+from energy_forecast.forecast_processor import ForecastProcessor
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_empty_slice(aggregation):
+    """A day type without any day gives zeros."""
+    result = aggregate_buckets(np.empty((3, 0, 24)), aggregation)
+
+    np.testing.assert_array_equal(result, np.zeros((3, 24)))
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_all_nan_buckets(aggregation):
+    """Buckets without data give zeros next to buckets with data."""
+    values = np.full((2, 5, 24), np.nan)
+    values[1, :, 3] = [1.0, 2.0, 3.0, np.nan, 4.0]
+
+    result = aggregate_buckets(values, aggregation)
+
+    assert not np.isnan(result).any()
+    assert (result[0] == 0).all()
+    assert result[1, 3] == 2.5
+    assert (np.delete(result[1], 3) == 0).all()
+
+
+@pytest.mark.parametrize(
+    ("aggregation", "expected"),
+    [
+        (AGGREGATION_MEAN, 11.8),
+        (AGGREGATION_MEDIAN, 5.5),
+        (AGGREGATION_TRIMMED_MEAN, 5.5),
+        (AGGREGATION_WINSORIZED_MEAN, 5.5),
+    ],
+)
+def test_outlier(aggregation, expected):
+    """Robust modes ignore or cap a single outlier."""
+    days = np.array([1.0, 2, 3, 4, 5, 6, 7, 8, 9, 73])
+    values = np.tile(days[np.newaxis, :, np.newaxis], (1, 1, 24))
+
+    result = aggregate_buckets(values, aggregation)
+
+    np.testing.assert_allclose(result, np.full((1, 24), expected))
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_process_historical_data_without_holidays(make_calendar, time_zone, aggregation):
+    """Every mode handles the empty holiday mask and falls back to weekends."""
+    time_zone("UTC")
+    calendar = make_calendar(date(2026, 6, 10))
+    days = (calendar.today - calendar.first_day).days + 1
+    values = np.ones((2, days, 24))
+
+    profiles = ForecastProcessor(None).process_historical_data(
+        values, calendar, set(), aggregation
+    )
+
+    np.testing.assert_array_equal(profiles, np.ones((3, 2, 24)))
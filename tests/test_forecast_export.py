@@ -0,0 +1,31 @@
+"""Tests for the forecast export files."""
+import numpy as np
+
+from energy_forecast.forecast_export import (
+    FORECAST_HEADER,
+    FORECAST_MAGIC,
+    remove_file,
+    write_forecast_file,
+)
+
+
+def test_write_and_remove_forecast_file(tmp_path):
+    """The forecast file is replaced in place and removed again."""
+    path = tmp_path / "energy_forecast" / "entry.forecast.bin"
+    values = np.arange(48, dtype=float).reshape(2, 24)
+
+    write_forecast_file(str(path), 1_780_000_000, [np.nan, 0.5], values)
+
+    data = path.read_bytes()
+    magic, _, series, start, _, count = FORECAST_HEADER.unpack_from(data)
+    assert (magic, series, start, count) == (FORECAST_MAGIC, 2, 1_780_000_000, 24)
+    stored = np.frombuffer(data, dtype="<f4", offset=FORECAST_HEADER.size + 2 * 4)
+    np.testing.assert_array_equal(stored.reshape(2, 24), values)
+
+    remove_file(str(path))
+    assert not path.exists()
+
+
+def test_remove_missing_file(tmp_path):
+    """Removing a file that was never written is not an error."""
+    remove_file(str(tmp_path / "entry.forecast.bin"))
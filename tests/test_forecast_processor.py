@@ -0,0 +1,227 @@
+"""Compare the vectorized history pipeline with plain-loop references."""
+from datetime import date, datetime, timedelta, timezone
+import math
+import random
+
+import numpy as np
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from energy_forecast.forecast_processor import ForecastProcessor
+
+
+def _reference_hourly_array(stats, entity_ids, first_day, days):
+    """Difference consecutive hourly sums and place them on local hours."""
+    result = [[[math.nan] * 24 for _ in range(days)] for _ in entity_ids]
+    for row, entity_id in enumerate(entity_ids):
+        previous = None
+        for stat in stats.get(entity_id, []):
+            start = datetime.fromtimestamp(stat["start"], timezone.utc)
+            if (
+                previous is not None
+                and start - previous[0] == timedelta(hours=1)
+                and stat["sum"] >= previous[1]
+            ):
+                local = dt_util.as_local(start)
+                day = (local.date() - first_day).days
+                if 0 <= day < days:
+                    delta = stat["sum"] - previous[1]
+                    cell = result[row][day][local.hour]
+                    result[row][day][local.hour] = delta if math.isnan(cell) else cell + delta
+            previous = (start, stat["sum"])
+    return np.array(result)
+
+
+def _reference_net(meter_values, sub_meter_values):
+    """Subtract sub-meters hour by hour, NaN unless every entity has the hour."""
+    days, hours = meter_values.shape[1:]
+    result = np.full((days, hours), np.nan)
+    for day in range(days):
+        for hour in range(hours):
+            meters = [meter[day][hour] for meter in meter_values]
+            sub_meters = [sub_meter[day][hour] for sub_meter in sub_meter_values]
+            if any(math.isnan(value) for value in meters + sub_meters):
+                continue
+            result[day][hour] = max(sum(meters) - sum(sub_meters), 0)
+    return result
+
+
+def _stats(start, hours, rate=1.0, skip=(), resets=(), seed=None):
+    """Return hourly cumulative sums, leaving out and resetting given hours."""
+    rng = random.Random(seed)
+    total = 100.0
+    rows = []
+    for hour in range(hours):
+        total += rate if seed is None else rng.uniform(0, 2 * rate)
+        if hour in resets:
+            total = 0.0
+        if hour not in skip:
+            rows.append({"start": (start + timedelta(hours=hour)).timestamp(), "sum": total})
+    return rows
+
+
+def _build(make_calendar, stats, entity_ids, today):
+    """Run the vectorized stage and the reference on the same input."""
+    calendar = make_calendar(today)
+    days = (calendar.today - calendar.first_day).days + 1
+    processor = ForecastProcessor(None)
+    values = processor.build_hourly_array(stats, entity_ids, calendar, days)
+    expected = _reference_hourly_array(stats, entity_ids, calendar.first_day, days)
+    return values, expected
+
+
+@pytest.mark.parametrize(
+    ("zone", "today"),
+    [
+        ("UTC", date(2026, 6, 10)),
+        ("Europe/Berlin", date(2026, 3, 31)),
+        ("Europe/Berlin", date(2026, 10, 27)),
+        ("America/New_York", date(2026, 11, 3)),
+        ("Australia/Adelaide", date(2026, 4, 7)),
+    ],
+)
+def test_build_hourly_array_matches_reference(make_calendar, time_zone, zone, today):
+    """Random sums with gaps and resets, including DST days."""
+    time_zone(zone)
+    start = dt_util.as_utc(dt_util.start_of_local_day(today - timedelta(days=31)))
+    stats = {
+        "sensor.a": _stats(start, 800, skip={10, 11, 300}, resets={50}, seed=1),
+        "sensor.b": _stats(start, 800, rate=0.5, skip={400}, resets={600, 601}, seed=2),
+        "sensor.c": _stats(start, 1),
+    }
+    values, expected = _build(make_calendar, stats, ["sensor.a", "sensor.b", "sensor.c", "sensor.d"], today)
+
+    np.testing.assert_allclose(values, expected, equal_nan=True)
+
+
+def test_build_hourly_array_gap_and_reset(make_calendar, time_zone):
+    """The hour after a gap and the hour of a reset are NaN."""
+    time_zone("UTC")
+    today = date(2026, 6, 10)
+    start = datetime(2026, 6, 1, tzinfo=timezone.utc)
+    stats = {"sensor.a": _stats(start, 48, skip={5}, resets={20})}
+    values, expected = _build(make_calendar, stats, ["sensor.a"], today)
+
+    day = (start.date() - (today - timedelta(days=30))).days
+    assert np.isnan(values[0, day, [0, 5, 6, 20]]).all()
+    assert values[0, day, 4] == 1.0
+    assert values[0, day, 21] == 1.0
+    np.testing.assert_allclose(values, expected, equal_nan=True)
+
+
+def test_build_hourly_array_dst_fall_back(make_calendar, time_zone):
+    """The repeated local hour adds up both hours."""
+    time_zone("Europe/Berlin")
+    today = date(2026, 10, 27)
+    start = dt_util.as_utc(dt_util.start_of_local_day(date(2026, 10, 24)))
+    stats = {"sensor.a": _stats(start, 24 * 4)}
+    values, expected = _build(make_calendar, stats, ["sensor.a"], today)
+
+    day = (date(2026, 10, 25) - (today - timedelta(days=30))).days
+    assert values[0, day, 2] == 2.0
+    assert np.nansum(values[0, day]) == 25.0
+    np.testing.assert_allclose(values, expected, equal_nan=True)
+
+
+def test_build_hourly_array_dst_spring_forward(make_calendar, time_zone):
+    """The skipped local hour has no value."""
+    time_zone("Europe/Berlin")
+    today = date(2026, 3, 31)
+    start = dt_util.as_utc(dt_util.start_of_local_day(date(2026, 3, 28)))
+    stats = {"sensor.a": _stats(start, 24 * 3)}
+    values, expected = _build(make_calendar, stats, ["sensor.a"], today)
+
+    day = (date(2026, 3, 29) - (today - timedelta(days=30))).days
+    assert np.isnan(values[0, day, 2])
+    assert np.nansum(values[0, day]) == 23.0
+    np.testing.assert_allclose(values, expected, equal_nan=True)
+
+
+def test_subtract_sub_meters_matches_reference():
+    """Random hours with missing meter and sub-meter hours."""
+    rng = np.random.default_rng(3)
+    meter_values = rng.random((3, 31, 24)) * 2
+    sub_meter_values = rng.random((2, 31, 24))
+    meter_values[rng.random(meter_values.shape) < 0.1] = np.nan
+    sub_meter_values[rng.random(sub_meter_values.shape) < 0.1] = np.nan
+
+    net = ForecastProcessor(None).subtract_sub_meters(meter_values, sub_meter_values)
+
+    np.testing.assert_allclose(
+        net, _reference_net(meter_values, sub_meter_values), equal_nan=True
+    )
+
+
+def test_subtract_sub_meters_missing_hours():
+    """A missing meter or sub-meter hour makes the net unknown."""
+    meter_values = np.ones((2, 1, 24))
+    sub_meter_values = np.full((1, 1, 24), 0.5)
+    meter_values[1, 0, 3] = np.nan
+    sub_meter_values[0, 0, 7] = np.nan
+
+    net = ForecastProcessor(None).subtract_sub_meters(meter_values, sub_meter_values)
+
+    assert np.isnan(net[0, [3, 7]]).all()
+    assert net[0, 0] == 1.5
+    np.testing.assert_allclose(
+        net, _reference_net(meter_values, sub_meter_values), equal_nan=True
+    )
+
+
+def test_subtract_sub_meters_unobserved_entities():
+    """A meter or sub-meter without any observed hour is left out."""
+    meter_values = np.ones((2, 2, 24))
+    sub_meter_values = np.full((2, 2, 24), 0.25)
+    meter_values[1] = np.nan
+    sub_meter_values[0] = np.nan
+    sub_meter_values[1, 0, 5] = np.nan
+
+    net = ForecastProcessor(None).subtract_sub_meters(meter_values, sub_meter_values)
+
+    assert np.isnan(net[0, 5])
+    assert np.count_nonzero(np.isnan(net)) == 1
+    assert net[1, 0] == 0.75
+    np.testing.assert_allclose(
+        net, _reference_net(meter_values[:1], sub_meter_values[1:]), equal_nan=True
+    )
+
+
+def test_subtract_sub_meters_without_observed_meters():
+    """Without any observed meter the net is unknown."""
+    net = ForecastProcessor(None).subtract_sub_meters(
+        np.full((1, 1, 24), np.nan), np.ones((1, 1, 24))
+    )
+
+    assert np.isnan(net).all()
+
+
+def test_subtract_sub_meters_without_sub_meters():
+    """Without sub-meters the net is the sum of the meters."""
+    meter_values = np.ones((2, 1, 24))
+
+    net = ForecastProcessor(None).subtract_sub_meters(meter_values, np.empty((0, 1, 24)))
+
+    np.testing.assert_array_equal(net, np.full((1, 24), 2.0))
+
+
+@pytest.mark.parametrize("holiday", ["2026-06-10", "06-10"])
+def test_holiday_today_falls_back_to_weekend(make_calendar, time_zone, holiday):
+    """Today's partial hours do not make up the holiday profile."""
+    time_zone("UTC")
+    calendar = make_calendar(date(2026, 6, 10), [holiday])
+    days = (calendar.today - calendar.first_day).days + 1
+    values = np.ones((1, days, 24))
+    values[:, -1, 10:] = np.nan
+    now = datetime(2026, 6, 10, 9, 30, tzinfo=timezone.utc)
+    processor = ForecastProcessor(None)
+
+    profiles = processor.process_historical_data(values, calendar)
+    quantiles = processor.process_historical_quantiles(
+        values[0], calendar, set(), [0.1, 0.5, 0.9]
+    )
+    _, forecast = processor.generate_hourly_forecast(now, calendar, profiles)
+
+    np.testing.assert_array_equal(profiles, np.ones((3, 1, 24)))
+    np.testing.assert_array_equal(quantiles, np.ones((3, 3, 24)))
+    np.testing.assert_array_equal(forecast, np.ones((1, 24)))